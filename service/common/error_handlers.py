@@ -2,6 +2,7 @@
 Module: error_handlers
 """
 from flask import jsonify
+from werkzeug.exceptions import HTTPException
 from service.models import DataValidationError
 from service import app
 from . import status
@@ -83,3 +84,19 @@ def internal_server_error(error):
         ),
         status.HTTP_500_INTERNAL_SERVER_ERROR,
     )
+
+
+@app.errorhandler(Exception)
+def unhandled_exception(error):
+    """Handles any uncaught exception with 500_SERVER_ERROR"""
+    if isinstance(error, HTTPException):
+        return error
+    app.logger.exception("Unhandled exception: %s", error)
+    return (
+        jsonify(
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            error="Internal Server Error",
+            message="Internal server error",
+        ),
+        status.HTTP_500_INTERNAL_SERVER_ERROR,
+    )
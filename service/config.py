@@ -19,5 +19,29 @@ if not DATABASE_URI:
 SQLALCHEMY_DATABASE_URI = DATABASE_URI
 SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+# Keep a warm pool of connections per worker; LIFO reuses the most recent
+# connections so the surplus can idle out on the Postgres side. Sized for one
+# gunicorn worker (WEB_CONCURRENCY) per replica: 3 replicas x 15 connections
+# stays well under Postgres's default max_connections of 100.
+SQLALCHEMY_ENGINE_OPTIONS = {
+    "pool_size": 5,
+    "max_overflow": 10,
+    "pool_timeout": 30,
+    "pool_recycle": 1800,
+    "pool_pre_ping": True,
+    "pool_use_lifo": True,
+}
+
+# Cache serialized Accounts in each worker process. Every worker and replica
+# keeps its own cache and only evicts on its own writes, so an Account changed
+# elsewhere can be served stale for up to ACCOUNT_CACHE_TTL seconds. It is off
+# unless explicitly enabled.
+ACCOUNT_CACHE_ENABLED = os.getenv("ACCOUNT_CACHE_ENABLED", "False").lower() == "true"
+ACCOUNT_CACHE_SIZE = int(os.getenv("ACCOUNT_CACHE_SIZE", "1024"))
+ACCOUNT_CACHE_TTL = float(os.getenv("ACCOUNT_CACHE_TTL", "5"))
+
+# Largest array of Accounts accepted by a single bulk create
+ACCOUNT_BATCH_LIMIT = int(os.getenv("ACCOUNT_BATCH_LIMIT", "100"))
+
 # Secret for session management
 SECRET_KEY = os.getenv("SECRET_KEY", "s3cr3t-key-shhhh")
@@ -6,6 +6,8 @@ All of the models are stored in this module
 import logging
 from datetime import date
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import insert, select
+from sqlalchemy.orm.attributes import set_committed_value
 
 logger = logging.getLogger("flask.app")
 
@@ -38,7 +40,30 @@ class PersistentBase:
         logger.info("Creating %s", self.name)
         self.id = None  # id must be none to generate next primary key
         db.session.add(self)
+        db.session.flush()  # assigns the new primary key
+        new_id = self.id
         db.session.commit()
+        # keep the key loaded so reading it does not refresh the whole row
+        set_committed_value(self, "id", new_id)
+
+    @classmethod
+    def bulk_create(cls, records):
+        """
+        Creates many records with a single INSERT
+
+        Returns the inserted rows, including their new ids, as dictionaries
+        """
+        logger.info("Creating %s records in bulk", len(records))
+        table = cls.__table__
+        columns = [column for column in table.columns if not column.primary_key]
+        values = [
+            {column.name: getattr(record, column.name) for column in columns}
+            for record in records
+        ]
+        statement = insert(table).values(values).returning(*table.columns)
+        rows = [dict(row) for row in db.session.execute(statement).mappings()]
+        db.session.commit()
+        return rows
 
     def update(self):
         """
@@ -69,11 +94,26 @@ class PersistentBase:
         logger.info("Processing all records")
         return cls.query.all()
 
+    @classmethod
+    def iter_as_dicts(cls, batch_size=500):
+        """
+        Returns an iterator of all the records as dictionaries
+
+        The query runs immediately; rows are fetched in batches of batch_size
+        as the iterator is consumed
+        """
+        logger.info("Streaming all records as dictionaries")
+        statement = select(*cls.__table__.columns).execution_options(
+            yield_per=batch_size
+        )
+        result = db.session.execute(statement).mappings()
+        return (dict(row) for row in result)
+
     @classmethod
     def find(cls, by_id):
         """Finds a record by it's ID"""
         logger.info("Processing lookup for id %s ...", by_id)
-        return cls.query.get(by_id)
+        return db.session.get(cls, by_id)
 
 
 ######################################################################
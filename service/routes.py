@@ -3,14 +3,46 @@ Account Service
 
 This microservice handles the lifecycle of Accounts
 """
-from flask import jsonify, request, make_response, abort, url_for
-from service.models import Account
+import time
+from collections import OrderedDict
+from decimal import Decimal
+from itertools import chain, islice
+import orjson
+from flask import request, abort, g, stream_with_context
+from service.models import Account, DataValidationError
 from service.common import status  # HTTP Status Codes
 from . import app  # Import Flask application
 
-# Ensure all routes are defined only once
+# Match trailing slashes without redirecting the client
 app.url_map.strict_slashes = False
 
+# In-process cache of (expiry, serialized Account) keyed by id
+# (see ACCOUNT_CACHE_ENABLED)
+account_cache = OrderedDict()
+# Token of each in-flight cache fill keyed by id; a write removes it
+account_reads = {}
+
+# Static response bodies are serialized once at import time
+HEALTH_BODY = orjson.dumps({"status": "OK"})
+INDEX_BODY = orjson.dumps({"name": "Account REST API Service", "version": "1.0"})
+
+# Prefix of the relative Location URL returned for new Accounts
+ACCOUNTS_PATH = "/accounts/"
+
+# Endpoints whose JSON request body is parsed before the view runs
+JSON_BODY_ENDPOINTS = frozenset(("create_accounts", "update_accounts"))
+
+
+############################################################
+# Request Hooks
+############################################################
+@app.before_request
+def parse_json_payload():
+    """Checks the media type and parses the JSON body of writes once"""
+    if request.method in ("POST", "PUT") and request.endpoint in JSON_BODY_ENDPOINTS:
+        check_content_type("application/json")
+        g.payload = get_json_payload()
+
 
 ############################################################
 # Health Endpoint
@@ -18,8 +50,7 @@ app.url_map.strict_slashes = False
 @app.route("/health", methods=["GET"])
 def health():
     """Health Status"""
-    app.logger.info("Health endpoint called")
-    return jsonify(dict(status="OK")), status.HTTP_200_OK
+    return make_raw_json_response(HEALTH_BODY)
 
 
 ######################################################################
@@ -29,13 +60,7 @@ def health():
 def root_index():
     """Root URL response"""
     app.logger.info("Root URL called")
-    return (
-        jsonify(
-            name="Account REST API Service",
-            version="1.0",
-        ),
-        status.HTTP_200_OK,
-    )
+    return make_raw_json_response(INDEX_BODY)
 
 
 ######################################################################
@@ -48,23 +73,25 @@ def create_accounts():
     This endpoint will create an Account based the data in the body that is posted
     """
     app.logger.info("Request to create an Account")
-    check_content_type("application/json")
+    payload = g.payload
+    if isinstance(payload, list):
+        return create_account_batch(payload)
+    account = Account()
     try:
-        account = Account()
-        account.deserialize(request.get_json())
-        account.create()
-        message = account.serialize()
-        location_url = url_for("get_accounts", account_id=account.id, _external=True)
-        app.logger.info("Account created with id: %s", account.id)
-        return make_response(
-            jsonify(message), status.HTTP_201_CREATED, {"Location": location_url}
-        )
+        account.deserialize(payload)
     except KeyError as e:
         app.logger.error("KeyError while creating account: %s", str(e))
         abort(status.HTTP_400_BAD_REQUEST, "Invalid input: missing required fields")
-    except Exception as e:
-        app.logger.error("Error creating account: %s", str(e))
-        abort(status.HTTP_500_INTERNAL_SERVER_ERROR, "Internal server error")
+    # serialize before the commit expires the instance's attributes
+    message = account.serialize()
+    account.create()
+    message["id"] = account.id
+    evict_cached_account(account.id)
+    location_url = f"{request.script_root}{ACCOUNTS_PATH}{account.id}"
+    app.logger.info("Account created with id: %s", account.id)
+    return make_json_response(
+        message, status.HTTP_201_CREATED, {"Location": location_url}
+    )
 
 
 ######################################################################
@@ -77,14 +104,18 @@ def list_accounts():
     This endpoint will list all Accounts
     """
     app.logger.info("Request to list Accounts")
-    try:
-        accounts = Account.all()
-        account_list = [account.serialize() for account in accounts]
-        app.logger.info("Returning [%s] accounts", len(account_list))
-        return jsonify(account_list), status.HTTP_200_OK
-    except Exception as e:
-        app.logger.error("Error listing accounts: %s", str(e))
-        abort(status.HTTP_500_INTERNAL_SERVER_ERROR, "Internal server error")
+    # Run the query and fetch the first batch here so database errors reach
+    # the error handlers. A failure on a later batch can only truncate the
+    # body. Each stream holds a pooled connection and a server-side cursor
+    # until the client has read the whole response, so slow readers count
+    # against SQLALCHEMY_ENGINE_OPTIONS' pool like any in-flight request.
+    rows = Account.iter_as_dicts()
+    first = list(islice(rows, 1))
+    return app.response_class(
+        stream_with_context(stream_json_array(chain(first, rows))),
+        status=status.HTTP_200_OK,
+        mimetype="application/json",
+    )
 
 
 ######################################################################
@@ -97,15 +128,13 @@ def get_accounts(account_id):
     This endpoint will read an Account based the account_id that is requested
     """
     app.logger.info("Request to read an Account with id: %s", account_id)
-    try:
-        account = Account.find(account_id)
-        if not account:
-            app.logger.warning("Account with id [%s] not found", account_id)
-            abort(status.HTTP_404_NOT_FOUND, f"Account with id [{account_id}] could not be found.")
-        return jsonify(account.serialize()), status.HTTP_200_OK
-    except Exception as e:
-        app.logger.error("Error reading account: %s", str(e))
-        abort(status.HTTP_500_INTERNAL_SERVER_ERROR, "Internal server error")
+    body = find_account_json(account_id)
+    if body is None:
+        app.logger.warning("Account with id [%s] not found", account_id)
+        abort(status.HTTP_404_NOT_FOUND, f"Account with id [{account_id}] could not be found.")
+    response = make_raw_json_response(body)
+    response.add_etag()
+    return response.make_conditional(request)
 
 
 ######################################################################
@@ -118,24 +147,23 @@ def update_accounts(account_id):
     This endpoint will update an Account based on the posted data
     """
     app.logger.info("Request to update an Account with id: %s", account_id)
+    account = Account.find(account_id)
+    if not account:
+        app.logger.warning("Account with id [%s] not found for update", account_id)
+        abort(
+            status.HTTP_404_NOT_FOUND,
+            f"Account with id [{account_id}] could not be found.",
+        )
     try:
-        account = Account.find(account_id)
-        if not account:
-            app.logger.warning("Account with id [%s] not found for update", account_id)
-            abort(
-                status.HTTP_404_NOT_FOUND,
-                f"Account with id [{account_id}] could not be found.",
-            )
-        account.deserialize(request.get_json())
-        account.update()
-        app.logger.info("Account with id [%s] updated", account_id)
-        return jsonify(account.serialize()), status.HTTP_200_OK
+        account.deserialize(g.payload)
     except KeyError as e:
         app.logger.error("KeyError while updating account: %s", str(e))
         abort(status.HTTP_400_BAD_REQUEST, "Invalid input: missing required fields")
-    except Exception as e:
-        app.logger.error("Error updating account: %s", str(e))
-        abort(status.HTTP_500_INTERNAL_SERVER_ERROR, "Internal server error")
+    message = account.serialize()
+    account.update()
+    evict_cached_account(account_id)
+    app.logger.info("Account with id [%s] updated", account_id)
+    return make_json_response(message)
 
 
 ######################################################################
@@ -148,17 +176,14 @@ def delete_accounts(account_id):
     This endpoint will delete an Account based on the account_id that is requested
     """
     app.logger.info("Request to delete an Account with id: %s", account_id)
-    try:
-        account = Account.find(account_id)
-        if account:
-            account.delete()
-            app.logger.info("Account with id [%s] deleted", account_id)
-        else:
-            app.logger.warning("Account with id [%s] not found for deletion", account_id)
-        return "", status.HTTP_204_NO_CONTENT
-    except Exception as e:
-        app.logger.error("Error deleting account: %s", str(e))
-        abort(status.HTTP_500_INTERNAL_SERVER_ERROR, "Internal server error")
+    account = Account.find(account_id)
+    if account:
+        account.delete()
+        evict_cached_account(account_id)
+        app.logger.info("Account with id [%s] deleted", account_id)
+    else:
+        app.logger.warning("Account with id [%s] not found for deletion", account_id)
+    return "", status.HTTP_204_NO_CONTENT
 
 
 ######################################################################
@@ -166,11 +191,99 @@ def delete_accounts(account_id):
 ######################################################################
 def check_content_type(media_type):
     """Checks that the media type is correct"""
-    content_type = request.headers.get("Content-Type")
-    if content_type and content_type == media_type:
+    if request.mimetype == media_type:
         return
-    app.logger.error("Invalid Content-Type: %s", content_type)
+    app.logger.error("Invalid Content-Type: %s", request.content_type)
     abort(
         status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
         f"Content-Type must be {media_type}",
     )
+
+
+def create_account_batch(payload):
+    """Creates every Account in the payload with a single INSERT"""
+    if not payload:
+        raise DataValidationError("Invalid Account batch: no accounts were sent")
+    limit = app.config["ACCOUNT_BATCH_LIMIT"]
+    if len(payload) > limit:
+        raise DataValidationError(
+            f"Invalid Account batch: at most {limit} accounts can be sent"
+        )
+    accounts = [Account().deserialize(data) for data in payload]
+    rows = Account.bulk_create(accounts)
+    app.logger.info("Created [%s] accounts", len(rows))
+    return make_json_response(rows, status.HTTP_201_CREATED)
+
+
+def get_json_payload():
+    """Parses the JSON body of the request with orjson"""
+    try:
+        return orjson.loads(request.get_data(cache=False))
+    except orjson.JSONDecodeError as error:
+        raise DataValidationError(f"Invalid JSON in request body: {error}") from error
+
+
+def find_account_json(account_id):
+    """Returns the Account serialized as JSON bytes or None if not found"""
+    use_cache = app.config["ACCOUNT_CACHE_ENABLED"]
+    token = None
+    if use_cache:
+        entry = account_cache.get(account_id)
+        if entry is not None and entry[0] > time.monotonic():
+            account_cache.move_to_end(account_id)
+            return entry[1]
+        token = account_reads[account_id] = object()
+    try:
+        account = Account.find(account_id)
+    finally:
+        # only fill the cache if no write evicted this id while the read was
+        # in flight; release the token even if the read failed
+        filling = use_cache and account_reads.get(account_id) is token
+        if filling:
+            del account_reads[account_id]
+    body = orjson.dumps(account.serialize(), default=_json_default) if account else None
+    if filling and body is not None:
+        expires = time.monotonic() + app.config["ACCOUNT_CACHE_TTL"]
+        account_cache[account_id] = (expires, body)
+        account_cache.move_to_end(account_id)
+        if len(account_cache) > app.config["ACCOUNT_CACHE_SIZE"]:
+            account_cache.popitem(last=False)
+    return body
+
+
+def evict_cached_account(account_id):
+    """Removes an Account from the cache after it has been written"""
+    account_cache.pop(account_id, None)
+    account_reads.pop(account_id, None)
+
+
+def make_json_response(payload, code=status.HTTP_200_OK, headers=None):
+    """Serializes the payload with orjson into a JSON response"""
+    return make_raw_json_response(
+        orjson.dumps(payload, default=_json_default), code, headers
+    )
+
+
+def make_raw_json_response(body, code=status.HTTP_200_OK, headers=None):
+    """Wraps already serialized JSON bytes in a response"""
+    return app.response_class(
+        body, status=code, headers=headers, mimetype="application/json"
+    )
+
+
+def stream_json_array(rows, chunk_size=500):
+    """Yields the rows as a JSON array, encoding chunk_size rows at a time"""
+    rows = iter(rows)
+    separator = b"["
+    for chunk in iter(lambda: list(islice(rows, chunk_size)), []):
+        # strip the brackets so the chunks join into one array
+        yield separator + orjson.dumps(chunk, default=_json_default)[1:-1]
+        separator = b","
+    yield b"]" if separator == b"," else b"[]"
+
+
+def _json_default(obj):
+    """Serializes the types that orjson does not handle natively"""
+    if isinstance(obj, Decimal):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
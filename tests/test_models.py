@@ -5,6 +5,7 @@ Test cases for Account Model
 import logging
 import unittest
 import os
+from sqlalchemy import text
 from service import app
 from service.models import Account, DataValidationError, db
 from tests.factories import AccountFactory
@@ -35,7 +36,8 @@ class TestAccount(unittest.TestCase):
 
     def setUp(self):
         """This runs before each test"""
-        db.session.query(Account).delete()  # clean up the last tests
+        # clean up the last tests
+        db.session.execute(text(f"TRUNCATE {Account.__table__.name} RESTART IDENTITY"))
         db.session.commit()
 
     def tearDown(self):
@@ -76,6 +78,18 @@ class TestAccount(unittest.TestCase):
         accounts = Account.all()
         self.assertEqual(len(accounts), 1)
 
+    def test_bulk_create_accounts(self):
+        """It should Create many Accounts with one insert"""
+        accounts = AccountFactory.create_batch(3)
+        rows = Account.bulk_create(accounts)
+        self.assertEqual(len(rows), 3)
+        self.assertTrue(all(row["id"] is not None for row in rows))
+        self.assertEqual(
+            sorted(row["email"] for row in rows),
+            sorted(account.email for account in accounts),
+        )
+        self.assertEqual(len(Account.all()), 3)
+
     def test_read_account(self):
         """It should Read an account"""
         account = AccountFactory()
@@ -132,6 +146,22 @@ class TestAccount(unittest.TestCase):
         accounts = Account.all()
         self.assertEqual(len(accounts), 5)
 
+    def test_iter_accounts_as_dicts(self):
+        """It should Stream all Accounts as dictionaries in batches"""
+        self.assertEqual(list(Account.iter_as_dicts()), [])
+        accounts = AccountFactory.create_batch(5)
+        for account in accounts:
+            account.create()
+        rows = list(Account.iter_as_dicts(batch_size=2))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(
+            sorted(row["id"] for row in rows),
+            sorted(account.id for account in accounts),
+        )
+        row = next(row for row in rows if row["id"] == accounts[0].id)
+        self.assertEqual(row["name"], accounts[0].name)
+        self.assertEqual(row["date_joined"], accounts[0].date_joined)
+
     def test_find_by_name(self):
         """It should Find an Account by name"""
         account = AccountFactory()
@@ -0,0 +1,16 @@
+"""
+WSGI entry point for gunicorn
+
+Patches the standard library and psycopg2 for gevent before the service
+package is imported so that database calls yield to other greenlets
+"""
+# pylint: disable=wrong-import-position
+from gevent import monkey
+
+monkey.patch_all()
+
+from psycogreen.gevent import patch_psycopg  # noqa: E402
+
+patch_psycopg()
+
+from service import app  # noqa: E402 F401 pylint: disable=unused-import